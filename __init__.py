@@ -24,6 +24,9 @@ Installation:
 
 import subprocess
 import importlib
+import importlib.util
+import hashlib
+import os
 import sys
 import logging
 
@@ -39,69 +42,107 @@ _REQUIRED_PACKAGES = [
     ("google.genai", "google-genai"),
     ("xai_sdk", "xai_sdk"),
     ("dashscope", "dashscope"),
+    ("orjson", "orjson"),
 ]
 
+# Written after a successful dependency check; skips the check on later starts
+_DEPS_STAMP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deps_ok.stamp")
+
+
+def _deps_fingerprint():
+    """Hash of the required package list and interpreter, stored in the stamp file."""
+    payload = repr((sys.executable, _REQUIRED_PACKAGES)).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _is_installed(import_name):
+    """Check whether a module can be imported, without executing it."""
+    try:
+        return importlib.util.find_spec(import_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _pip_install(pip_names):
+    subprocess.check_call(
+        [sys.executable, "-m", "pip", "install", *pip_names, "-q"],
+        stdout=subprocess.DEVNULL,
+    )
+
 
 def _ensure_packages():
     """Check and auto-install missing packages at startup."""
-    for import_name, pip_name in _REQUIRED_PACKAGES:
+    fingerprint = _deps_fingerprint()
+    try:
+        with open(_DEPS_STAMP_FILE, "r", encoding="utf-8") as f:
+            if f.read().strip() == fingerprint:
+                return
+    except OSError:
+        pass
+
+    missing = [pip_name for import_name, pip_name in _REQUIRED_PACKAGES
+               if not _is_installed(import_name)]
+    if missing:
+        logger.info(f"[APIImage] Installing missing packages: {', '.join(missing)}")
         try:
-            importlib.import_module(import_name)
-        except ImportError:
-            logger.info(f"[APIImage] Installing missing package: {pip_name}")
-            try:
-                subprocess.check_call(
-                    [sys.executable, "-m", "pip", "install", pip_name, "-q"],
-                    stdout=subprocess.DEVNULL,
-                )
-                logger.info(f"[APIImage] Successfully installed {pip_name}")
-            except Exception as e:
-                logger.warning(
-                    f"[APIImage] Failed to install {pip_name}: {e}. "
-                    f"You can install it manually: pip install {pip_name}"
-                )
+            # One pip invocation for everything to pay pip's startup cost once
+            _pip_install(missing)
+            logger.info(f"[APIImage] Successfully installed {', '.join(missing)}")
+        except Exception:
+            # Fall back to one-by-one so a single bad package doesn't block the rest
+            for pip_name in missing:
+                try:
+                    _pip_install([pip_name])
+                    logger.info(f"[APIImage] Successfully installed {pip_name}")
+                except Exception as e:
+                    logger.warning(
+                        f"[APIImage] Failed to install {pip_name}: {e}. "
+                        f"You can install it manually: pip install {pip_name}"
+                    )
+        importlib.invalidate_caches()
+        if not all(_is_installed(import_name) for import_name, _ in _REQUIRED_PACKAGES):
+            return
+
+    try:
+        with open(_DEPS_STAMP_FILE, "w", encoding="utf-8") as f:
+            f.write(fingerprint)
+    except OSError as e:
+        logger.warning(f"[APIImage] Failed to write {_DEPS_STAMP_FILE}: {e}")
 
 
 _ensure_packages()
 
-# ============================================================
-# Node Imports
-# ============================================================
-from .nodes_gemini import GeminiImageGenerate
-from .nodes_grok import GrokImageGenerate
-from .nodes_openai import OpenAIImageGenerate
-from .nodes_qwen import QwenImageGenerate
-from .nodes_glm import GLMImageGenerate
-from .nodes_config import APIImageConfigLoader, APIImageConfigSaver
-from .nodes_save import APIImageSave
-
 # ============================================================
 # Node Registration
 # ============================================================
+# Single declarative table: (node_id, module, class_name, display_name).
 # NODE_CLASS_MAPPINGS maps internal node IDs to Python classes.
 # NODE_DISPLAY_NAME_MAPPINGS maps internal node IDs to display names
 # shown in the ComfyUI node picker.
+#
+# Classes are bound eagerly: ComfyUI iterates the mapping and calls
+# INPUT_TYPES on every node at startup, so a lazy proxy would be resolved
+# immediately anyway. Provider SDKs are imported inside each node's
+# generate(), which keeps module import cheap.
+_NODE_TABLE = [
+    ("APIImage_GeminiGenerate", "nodes_gemini", "GeminiImageGenerate", "Gemini Image Generate"),
+    ("APIImage_GrokGenerate", "nodes_grok", "GrokImageGenerate", "Grok Image Generate"),
+    ("APIImage_OpenAIGenerate", "nodes_openai", "OpenAIImageGenerate", "OpenAI Image Generate"),
+    ("APIImage_QwenGenerate", "nodes_qwen", "QwenImageGenerate", "Qwen Image Generate"),
+    ("APIImage_GLMGenerate", "nodes_glm", "GLMImageGenerate", "GLM Image Generate"),
+    ("APIImage_ConfigLoader", "nodes_config", "APIImageConfigLoader", "API Config Loader"),
+    ("APIImage_ConfigSaver", "nodes_config", "APIImageConfigSaver", "API Config Saver"),
+    ("APIImage_SaveImage", "nodes_save", "APIImageSave", "API Image Save"),
+]
 
 NODE_CLASS_MAPPINGS = {
-    "APIImage_GeminiGenerate": GeminiImageGenerate,
-    "APIImage_GrokGenerate": GrokImageGenerate,
-    "APIImage_OpenAIGenerate": OpenAIImageGenerate,
-    "APIImage_QwenGenerate": QwenImageGenerate,
-    "APIImage_GLMGenerate": GLMImageGenerate,
-    "APIImage_ConfigLoader": APIImageConfigLoader,
-    "APIImage_ConfigSaver": APIImageConfigSaver,
-    "APIImage_SaveImage": APIImageSave,
+    node_id: getattr(importlib.import_module(f".{module_name}", __name__), class_name)
+    for node_id, module_name, class_name, _ in _NODE_TABLE
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
-    "APIImage_GeminiGenerate": "Gemini Image Generate",
-    "APIImage_GrokGenerate": "Grok Image Generate",
-    "APIImage_OpenAIGenerate": "OpenAI Image Generate",
-    "APIImage_QwenGenerate": "Qwen Image Generate",
-    "APIImage_GLMGenerate": "GLM Image Generate",
-    "APIImage_ConfigLoader": "API Config Loader",
-    "APIImage_ConfigSaver": "API Config Saver",
-    "APIImage_SaveImage": "API Image Save",
+    node_id: display_name
+    for node_id, _, _, display_name in _NODE_TABLE
 }
 
 # Optional: web directory for JavaScript extensions
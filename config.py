@@ -4,9 +4,19 @@ Persistent API configuration management for ComfyUI API Image nodes.
 Stores configuration in api_config.json within the plugin directory.
 Supports multiple API types, custom model lists, and automatic migration.
 """
+import copy
+import hashlib
 import json
 import os
 import logging
+import threading
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger("ComfyUI-APIImage")
 
@@ -14,6 +24,21 @@ logger = logging.getLogger("ComfyUI-APIImage")
 CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(CONFIG_DIR, "api_config.json")
 
+# In-memory cache of the parsed config, invalidated by the file's mtime.
+# INPUT_TYPES of every generator node reads the config on each UI refresh,
+# so re-parsing the file every time is avoided.
+# Stored as an immutable (mtime_ns, config) snapshot that is swapped
+# atomically: readers grab the tuple without locking, writers build a new
+# config and replace the whole tuple. A snapshot's dict is never mutated.
+_CONFIG_CACHE = None
+# Digest of the bytes currently on disk, used to skip no-op writes
+_CONFIG_DIGEST = None
+# Held by writers and by cache reloads, never on the cache-hit read path
+_CONFIG_LOCK = threading.RLock()
+
+# Merged model lists per API type, keyed on the config dict they were built from
+_MODEL_LIST_CACHE = {}
+
 # Built-in model lists for each API type
 BUILTIN_MODELS = {
     "Gemini Native": [
@@ -75,83 +100,257 @@ DEFAULT_CONFIG = {
 }
 
 
-def load_config():
-    """Load configuration from api_config.json, creating default if missing."""
-    if not os.path.exists(CONFIG_FILE):
+@dataclass(frozen=True, slots=True)
+class ApiProfile:
+    """
+    Saved settings for one API type.
+
+    Instances are immutable so cached snapshots can be shared safely;
+    use dataclasses.replace() to derive an updated profile.
+    """
+    api_key: str = ""
+    base_url: str = ""
+    model_name: str = ""
+    custom_models: Tuple[str, ...] = ()
+
+
+_PROFILE_FIELDS = tuple(f.name for f in fields(ApiProfile))
+_EMPTY_PROFILE = ApiProfile()
+
+
+def _to_profile(api_type, entry):
+    """Build an ApiProfile from a JSON entry, filling gaps from DEFAULT_CONFIG."""
+    if isinstance(entry, ApiProfile):
+        return entry
+    defaults = DEFAULT_CONFIG["api_configs"].get(api_type, {})
+    values = {}
+    for name in _PROFILE_FIELDS:
+        if name in entry:
+            values[name] = entry[name]
+        elif name in defaults:
+            values[name] = defaults[name]
+    values["custom_models"] = tuple(values.get("custom_models") or ())
+    return ApiProfile(**values)
+
+
+def _materialize(config):
+    """
+    Return a new config dict with every api_configs entry as an ApiProfile.
+
+    Also performs migration: any API type missing from the file is added
+    with its defaults, and missing keys within an entry are defaulted.
+    """
+    result = {k: copy.deepcopy(v) for k, v in config.items() if k != "api_configs"}
+    api_configs = {
+        api_type: _to_profile(api_type, entry)
+        for api_type, entry in (config.get("api_configs") or {}).items()
+    }
+    for api_type, defaults in DEFAULT_CONFIG["api_configs"].items():
+        if api_type not in api_configs:
+            api_configs[api_type] = _to_profile(api_type, defaults)
+    result["api_configs"] = api_configs
+    return result
+
+
+# Served when the config file cannot be read
+_DEFAULT_MATERIALIZED = _materialize(DEFAULT_CONFIG)
+
+
+def _json_default(obj):
+    if isinstance(obj, ApiProfile):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _loads(raw):
+    """Parse config file bytes (UTF-8 JSON) in a single pass."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps(config):
+    """Serialize config to UTF-8 JSON bytes."""
+    if orjson is not None:
+        # orjson serializes dataclasses natively
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(config, indent=2, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _get_cached():
+    """
+    Return the cached config dict, reloading only if the file changed on disk.
+
+    The returned dict is shared; callers must treat it as read-only.
+    Use load_config() to get a private copy for mutation.
+    """
+    snapshot = _CONFIG_CACHE
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    if snapshot is not None and snapshot[0] == mtime:
+        return snapshot[1]
+    with _CONFIG_LOCK:
+        return _reload_config()
+
+
+def _reload_config():
+    """Re-read api_config.json into the cache. Caller must hold _CONFIG_LOCK."""
+    global _CONFIG_CACHE, _CONFIG_DIGEST
+    try:
+        with open(CONFIG_FILE, "rb") as f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            snapshot = _CONFIG_CACHE
+            if snapshot is not None and snapshot[0] == mtime:
+                # Another thread reloaded it while we waited for the lock
+                return snapshot[1]
+            raw = f.read()
+    except FileNotFoundError:
+        _CONFIG_DIGEST = None
         save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
+        return _CONFIG_CACHE[1] if _CONFIG_CACHE is not None else _DEFAULT_MATERIALIZED
+    except OSError as e:
+        logger.error(f"Failed to load config: {e}")
+        return _DEFAULT_MATERIALIZED
+
     try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            config = json.load(f)
-
-        # Migration: ensure all API types exist
-        if "api_configs" not in config:
-            config["api_configs"] = DEFAULT_CONFIG["api_configs"].copy()
-        else:
-            for api_type, defaults in DEFAULT_CONFIG["api_configs"].items():
-                if api_type not in config["api_configs"]:
-                    config["api_configs"][api_type] = defaults.copy()
-                else:
-                    # Ensure custom_models key exists
-                    if "custom_models" not in config["api_configs"][api_type]:
-                        config["api_configs"][api_type]["custom_models"] = []
-                    # Ensure all default keys exist
-                    for k, v in defaults.items():
-                        if k not in config["api_configs"][api_type]:
-                            config["api_configs"][api_type][k] = v
-
-        return config
+        config = _materialize(_loads(raw))
     except Exception as e:
         logger.error(f"Failed to load config: {e}")
-        return DEFAULT_CONFIG.copy()
+        return _DEFAULT_MATERIALIZED
+
+    _CONFIG_CACHE = (mtime, config)
+    _CONFIG_DIGEST = _digest(raw)
+    return config
+
+
+def load_config():
+    """Load configuration from api_config.json, creating default if missing.
+
+    Returns a private copy that the caller may mutate and pass to save_config().
+    Profiles are immutable, so only the containing dicts are copied.
+    """
+    return _materialize(_get_cached())
 
 
 def save_config(config):
-    """Save configuration to api_config.json."""
-    try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
-        logger.info(f"Config saved to {CONFIG_FILE}")
-    except Exception as e:
-        logger.error(f"Failed to save config: {e}")
+    """Save configuration to api_config.json and refresh the in-memory cache.
+
+    The write is skipped when the serialized config matches what is already
+    on disk.
+    """
+    global _CONFIG_CACHE, _CONFIG_DIGEST
+    with _CONFIG_LOCK:
+        try:
+            data = _dumps(config)
+            digest = _digest(data)
+            if digest == _CONFIG_DIGEST:
+                logger.debug("Config unchanged, skipping write")
+                return
+            # Write to a temp file and swap it in, so a crash mid-write
+            # never leaves a truncated api_config.json behind.
+            tmp_file = CONFIG_FILE + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(data)
+            os.replace(tmp_file, CONFIG_FILE)
+            _CONFIG_CACHE = (os.stat(CONFIG_FILE).st_mtime_ns, _materialize(config))
+            _CONFIG_DIGEST = digest
+            logger.info(f"Config saved to {CONFIG_FILE}")
+        except Exception as e:
+            logger.error(f"Failed to save config: {e}")
 
 
-def get_api_config(api_type):
-    """Get configuration for a specific API type."""
-    config = load_config()
-    return config.get("api_configs", {}).get(api_type, {})
+def get_api_config(api_type, _cfg=None):
+    """Get configuration for a specific API type (read-only, served from cache).
+
+    _cfg: optional config snapshot from _get_cached(), to skip the cache check
+    when the caller already holds one.
+    """
+    config = _cfg if _cfg is not None else _get_cached()
+    return config.get("api_configs", {}).get(api_type, _EMPTY_PROFILE)
+
+
+def update_api(api_type, *, api_key=None, base_url=None, model_name=None,
+               add_model=None, remove_model=None):
+    """
+    Apply several changes to one API type with a single load and save.
+
+    Fields left as None are not touched. The model list is updated after
+    the scalar fields, add before remove. Nothing is written if the result
+    equals what is already on disk.
+
+    Returns:
+        tuple: (cfg, added, removed) - the updated ApiProfile for api_type
+        and whether add_model / remove_model actually changed the list.
+    """
+    with _CONFIG_LOCK:
+        config = load_config()
+        api_configs = config["api_configs"]
+        cfg = api_configs.get(api_type) or _to_profile(api_type, {})
+
+        changes = {}
+        if api_key is not None:
+            changes["api_key"] = api_key
+        if base_url is not None:
+            changes["base_url"] = base_url
+        if model_name is not None:
+            changes["model_name"] = model_name
+
+        customs = list(cfg.custom_models)
+        added = False
+        if add_model and add_model.strip():
+            add_model = add_model.strip()
+            if add_model not in customs:
+                customs.append(add_model)
+                added = True
+                logger.info(f"Added custom model '{add_model}' to {api_type}")
+        removed = False
+        if remove_model and remove_model in customs:
+            customs.remove(remove_model)
+            removed = True
+            logger.info(f"Removed custom model '{remove_model}' from {api_type}")
+        if added or removed:
+            changes["custom_models"] = tuple(customs)
+
+        cfg = replace(cfg, **changes)
+        api_configs[api_type] = cfg
+        save_config(config)
+        return cfg, added, removed
 
 
 def set_api_config(api_type, api_key=None, base_url=None, model_name=None):
     """Update configuration for a specific API type and persist."""
-    config = load_config()
-    if api_type not in config.get("api_configs", {}):
-        config.setdefault("api_configs", {})[api_type] = DEFAULT_CONFIG["api_configs"].get(
-            api_type, {"api_key": "", "base_url": "", "model_name": "", "custom_models": []}
-        ).copy()
-
-    cfg = config["api_configs"][api_type]
-    if api_key is not None:
-        cfg["api_key"] = api_key
-    if base_url is not None:
-        cfg["base_url"] = base_url
-    if model_name is not None:
-        cfg["model_name"] = model_name
-
-    save_config(config)
+    cfg, _, _ = update_api(api_type, api_key=api_key, base_url=base_url, model_name=model_name)
     return cfg
 
 
-def get_model_list(api_type):
-    """Get combined list of built-in + custom models for an API type."""
+def get_model_list(api_type, _cfg=None):
+    """Get combined list of built-in + custom models for an API type.
+
+    The result is memoized against the current config snapshot, so repeated
+    INPUT_TYPES calls get the same list object back. Do not mutate it.
+    _cfg works as in get_api_config().
+    """
+    config = _cfg if _cfg is not None else _get_cached()
+    cached = _MODEL_LIST_CACHE.get(api_type)
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
     builtin = BUILTIN_MODELS.get(api_type, [])
-    cfg = get_api_config(api_type)
-    custom = cfg.get("custom_models", [])
+    custom = config.get("api_configs", {}).get(api_type, _EMPTY_PROFILE).custom_models
     # Merge, preserving order, no duplicates
+    seen = set(builtin)
     all_models = list(builtin)
     for m in custom:
-        if m and m not in all_models:
+        if m and m not in seen:
+            seen.add(m)
             all_models.append(m)
+    _MODEL_LIST_CACHE[api_type] = (config, all_models)
     return all_models
 
 
@@ -159,26 +358,11 @@ def add_custom_model(api_type, model_name):
     """Add a custom model to the persistent config."""
     if not model_name or not model_name.strip():
         return False
-    model_name = model_name.strip()
-    config = load_config()
-    cfg = config.setdefault("api_configs", {}).setdefault(api_type, {})
-    customs = cfg.setdefault("custom_models", [])
-    if model_name not in customs:
-        customs.append(model_name)
-        save_config(config)
-        logger.info(f"Added custom model '{model_name}' to {api_type}")
-        return True
-    return False
+    _, added, _ = update_api(api_type, add_model=model_name)
+    return added
 
 
 def remove_custom_model(api_type, model_name):
     """Remove a custom model from the persistent config."""
-    config = load_config()
-    cfg = config.get("api_configs", {}).get(api_type, {})
-    customs = cfg.get("custom_models", [])
-    if model_name in customs:
-        customs.remove(model_name)
-        save_config(config)
-        logger.info(f"Removed custom model '{model_name}' from {api_type}")
-        return True
-    return False
+    _, _, removed = update_api(api_type, remove_model=model_name)
+    return removed
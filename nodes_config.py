@@ -6,13 +6,15 @@ Supports adding custom models dynamically.
 """
 import logging
 
-from .config import (
-    get_api_config, set_api_config, get_model_list,
-    add_custom_model, remove_custom_model, load_config
-)
+from .config import get_api_config, get_model_list, load_config, update_api
 
 logger = logging.getLogger("ComfyUI-APIImage")
 
+# API types both config nodes offer; ComfyUI only treats a list as a combo, so
+# the option spec converts the tuple
+_API_TYPES = ("Gemini Native", "Grok API", "OpenAI Compatible", "Qwen Image", "GLM Image")
+_API_TYPES_OPT = (list(_API_TYPES), {"default": "Gemini Native"})
+
 
 class APIImageConfigLoader:
     """
@@ -22,6 +24,8 @@ class APIImageConfigLoader:
     generation nodes. Configuration is stored in api_config.json.
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/Config"
     FUNCTION = "load"
     RETURN_TYPES = ("STRING", "STRING", "STRING",)
@@ -31,9 +35,7 @@ class APIImageConfigLoader:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "api_type": (["Gemini Native", "Grok API", "OpenAI Compatible", "Qwen Image", "GLM Image"], {
-                    "default": "Gemini Native"
-                }),
+                "api_type": _API_TYPES_OPT,
             },
             "optional": {
                 "api_key_override": ("STRING", {
@@ -55,9 +57,9 @@ class APIImageConfigLoader:
         """Load API configuration, applying any overrides."""
         cfg = get_api_config(api_type)
 
-        api_key = api_key_override.strip() if api_key_override and api_key_override.strip() else cfg.get("api_key", "")
-        base_url = base_url_override.strip() if base_url_override and base_url_override.strip() else cfg.get("base_url", "")
-        model_name = model_override.strip() if model_override and model_override.strip() else cfg.get("model_name", "")
+        api_key = api_key_override.strip() if api_key_override and api_key_override.strip() else cfg.api_key
+        base_url = base_url_override.strip() if base_url_override and base_url_override.strip() else cfg.base_url
+        model_name = model_override.strip() if model_override and model_override.strip() else cfg.model_name
 
         if not api_key:
             logger.warning(f"[ConfigLoader] No API key found for {api_type}. Please configure it.")
@@ -75,6 +77,8 @@ class APIImageConfigSaver:
     to api_config.json for use across ComfyUI sessions.
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/Config"
     FUNCTION = "save"
     OUTPUT_NODE = True
@@ -85,9 +89,7 @@ class APIImageConfigSaver:
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "api_type": (["Gemini Native", "Grok API", "OpenAI Compatible", "Qwen Image", "GLM Image"], {
-                    "default": "Gemini Native"
-                }),
+                "api_type": _API_TYPES_OPT,
                 "api_key": ("STRING", {
                     "default": "",
                     "placeholder": "API Key to save"
@@ -119,7 +121,7 @@ class APIImageConfigSaver:
         """Save API configuration and manage custom models."""
         status_parts = []
 
-        # Save main config
+        # Collect all changes and apply them with a single load + save
         save_kwargs = {}
         if api_key and api_key.strip():
             save_kwargs["api_key"] = api_key.strip()
@@ -127,26 +129,33 @@ class APIImageConfigSaver:
             save_kwargs["base_url"] = base_url.strip()
         if model_name and model_name.strip():
             save_kwargs["model_name"] = model_name.strip()
-
-        if save_kwargs:
-            set_api_config(api_type, **save_kwargs)
-            status_parts.append(f"Saved config for {api_type}: {list(save_kwargs.keys())}")
-
-        # Add custom model
-        if add_custom_model_name and add_custom_model_name.strip():
-            added = add_custom_model(api_type, add_custom_model_name.strip())
-            if added:
-                status_parts.append(f"Added custom model: {add_custom_model_name.strip()}")
-            else:
-                status_parts.append(f"Model already exists: {add_custom_model_name.strip()}")
-
-        # Remove custom model
-        if remove_custom_model_name and remove_custom_model_name.strip():
-            removed = remove_custom_model(api_type, remove_custom_model_name.strip())
-            if removed:
-                status_parts.append(f"Removed custom model: {remove_custom_model_name.strip()}")
-            else:
-                status_parts.append(f"Model not found: {remove_custom_model_name.strip()}")
+        add_name = add_custom_model_name.strip() if add_custom_model_name else ""
+        remove_name = remove_custom_model_name.strip() if remove_custom_model_name else ""
+
+        if save_kwargs or add_name or remove_name:
+            _, added, removed = update_api(
+                api_type,
+                add_model=add_name or None,
+                remove_model=remove_name or None,
+                **save_kwargs,
+            )
+
+            if save_kwargs:
+                status_parts.append(f"Saved config for {api_type}: {list(save_kwargs.keys())}")
+
+            # Add custom model
+            if add_name:
+                if added:
+                    status_parts.append(f"Added custom model: {add_name}")
+                else:
+                    status_parts.append(f"Model already exists: {add_name}")
+
+            # Remove custom model
+            if remove_name:
+                if removed:
+                    status_parts.append(f"Removed custom model: {remove_name}")
+                else:
+                    status_parts.append(f"Model not found: {remove_name}")
 
         status = " | ".join(status_parts) if status_parts else "No changes to save"
         logger.info(f"[ConfigSaver] {status}")
@@ -12,10 +12,12 @@ Reference: https://ai.google.dev/gemini-api/docs/image-generation
 """
 import logging
 import io
+import re
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 
-from .config import get_api_config, get_model_list, BUILTIN_MODELS
+from .config import get_api_config, get_model_list, BUILTIN_MODELS, _get_cached
 from .utils import tensor_to_pil, pil_to_tensor, bytes_to_tensor, mask_to_pil, sanitize_url, validate_ref_images
 
 logger = logging.getLogger("ComfyUI-APIImage")
@@ -29,6 +31,53 @@ MODEL_REF_IMAGE_LIMITS = {
     "gemini-3-pro-image-preview": (0, 14),
 }
 
+# Max concurrent generate_content calls when num_images > 1
+MAX_PARALLEL_REQUESTS = 4
+
+# Known API error signatures, matched in a single scan of the error string.
+# Status codes are case-sensitive; only the timeout wording ignores case.
+_ERR_RE = re.compile(
+    r"(?P<auth>401|UNAUTHENTICATED)"
+    r"|(?P<nf>404|NOT_FOUND)"
+    r"|(?P<perm>403|PERMISSION_DENIED)"
+    r"|(?P<quota>429|RESOURCE_EXHAUSTED)"
+    r"|(?P<busy>503|UNAVAILABLE)"
+    r"|(?P<to>(?i:timed out|timeout))"
+)
+_ERR_MESSAGES = {
+    "auth": "Authentication failed (401). Please check your Google API key.",
+    "nf": "Model '{model}' not found (404).",
+    "perm": "Permission denied (403). Check billing at: https://aistudio.google.com",
+    "quota": "API quota exceeded (429). Wait for quota reset or switch to a different model.",
+    "busy": "Model overloaded (503). Retry in 1-2 minutes.",
+    "to": "Network timeout. Check your connection.",
+}
+
+# Combo choices for image_config; "Default" leaves the field unset so the model decides
+_API_TYPE = "Gemini Native"
+_ASPECT_RATIO_OPT = (["Default", "1:1", "3:2", "2:3", "4:3", "3:4", "16:9", "9:16", "21:9", "4:5"], {
+    "default": "Default"
+})
+_RESOLUTION_OPT = (["Default", "1K", "2K", "4K"], {
+    "default": "Default"
+})
+
+
+def _inline_image_bytes(part) -> bytes:
+    """
+    Return the encoded image bytes carried by a response part.
+
+    inline_data.data already holds PNG/JPEG bytes, so it is passed straight
+    through (base64-decoded only if the SDK returned a str). part.as_image()
+    plus a PNG re-encode is used only when no raw payload is present.
+    """
+    raw = part.inline_data.data
+    if raw:
+        return raw if isinstance(raw, bytes) else base64.b64decode(raw)
+    buf = io.BytesIO()
+    part.as_image().save(buf, format="PNG")
+    return buf.getvalue()
+
 
 class GeminiImageGenerate:
     """
@@ -38,6 +87,8 @@ class GeminiImageGenerate:
     and mask-based inpainting. Uses the official google-genai SDK.
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/Gemini"
     FUNCTION = "generate"
     OUTPUT_NODE = True
@@ -47,14 +98,15 @@ class GeminiImageGenerate:
     @classmethod
     def INPUT_TYPES(cls):
         # Get available models (built-in + custom)
-        models = get_model_list("Gemini Native")
+        cfg = _get_cached()
+        models = get_model_list(_API_TYPE, _cfg=cfg)
         if not models:
-            models = BUILTIN_MODELS.get("Gemini Native", ["gemini-2.5-flash-image"])
+            models = BUILTIN_MODELS.get(_API_TYPE, ["gemini-2.5-flash-image"])
 
         # Load saved api_key as default
-        saved_config = get_api_config("Gemini Native")
-        saved_key = saved_config.get("api_key", "")
-        saved_url = saved_config.get("base_url", "")
+        saved_config = get_api_config(_API_TYPE, _cfg=cfg)
+        saved_key = saved_config.api_key
+        saved_url = saved_config.base_url
 
         return {
             "required": {
@@ -77,12 +129,8 @@ class GeminiImageGenerate:
                     "min": 1,
                     "max": 4,
                 }),
-                "aspect_ratio": (["Default", "1:1", "3:2", "2:3", "4:3", "3:4", "16:9", "9:16", "21:9", "4:5"], {
-                    "default": "Default"
-                }),
-                "resolution": (["Default", "1K", "2K", "4K"], {
-                    "default": "Default"
-                }),
+                "aspect_ratio": _ASPECT_RATIO_OPT,
+                "resolution": _RESOLUTION_OPT,
                 "base_url": ("STRING", {
                     "default": saved_url,
                     "placeholder": "Leave empty for default, or set proxy URL"
@@ -123,20 +171,26 @@ class GeminiImageGenerate:
         import torch
 
         # --- Input Validation ---
-        if not prompt or not prompt.strip():
+        # Normalize text inputs once; the stripped locals are used throughout.
+        prompt = prompt.strip() if prompt else ""
+        api_key = api_key.strip() if api_key else ""
+        base_url = base_url.strip() if base_url else ""
+        custom_model = custom_model.strip() if custom_model else ""
+
+        if not prompt:
             raise ValueError(
                 "[APIImage Gemini] Prompt is empty. "
                 "Please enter a text prompt describing the image you want to generate."
             )
 
-        if not api_key or not api_key.strip():
+        if not api_key:
             raise ValueError(
                 "[APIImage Gemini] API Key is not set. "
                 "Please provide a valid Google API key (format: AIzaSy...). "
                 "Get one at: https://aistudio.google.com/apikey"
             )
 
-        effective_model = custom_model.strip() if custom_model and custom_model.strip() else model_name
+        effective_model = custom_model or model_name
         logger.info(
             f"[Gemini] Starting generation | Model: {effective_model} | "
             f"AspectRatio: {aspect_ratio} | "
@@ -186,10 +240,18 @@ class GeminiImageGenerate:
         # Fallback config: strict parity with the simplest core path.
         # When moderation false-positives happen in multi-image editing,
         # dropping optional image_config can improve pass rate.
-        gen_config_fallback = types.GenerateContentConfig(
-            response_modalities=["TEXT", "IMAGE"],
-            safety_settings=safety_settings,
-        )
+        # Only the reference-image attempt plan uses it, and without
+        # image_config it would be identical to the primary config.
+        has_any_ref = ref_images is not None or image1 is not None or image2 is not None or image3 is not None
+        gen_config_fallback = None
+        if has_any_ref:
+            if image_config_kwargs:
+                gen_config_fallback = types.GenerateContentConfig(
+                    response_modalities=["TEXT", "IMAGE"],
+                    safety_settings=safety_settings,
+                )
+            else:
+                gen_config_fallback = gen_config_primary
 
         # --- Validate reference images ---
         extra_img_count = sum(1 for s in [image1, image2, image3] if s is not None)
@@ -265,7 +327,7 @@ class GeminiImageGenerate:
 
         def _build_client(use_custom_endpoint: bool):
             try:
-                client_kwargs = {"api_key": api_key.strip()}
+                client_kwargs = {"api_key": api_key}
                 if use_custom_endpoint and effective_url:
                     client_kwargs["http_options"] = {"base_url": effective_url}
                     logger.info(f"[Gemini] Using custom endpoint: {effective_url}")
@@ -320,87 +382,78 @@ class GeminiImageGenerate:
                         text_messages_local.append(part.text)
                     elif part.inline_data is not None:
                         try:
-                            img = part.as_image()
-                            buf = io.BytesIO()
-                            img.save(buf, format="PNG")
-                            images_data_local.append(buf.getvalue())
-                        except Exception as e1:
-                            logger.warning(
-                                f"[Gemini] part.as_image() failed: {e1}, trying raw data"
-                            )
-                            try:
-                                raw = part.inline_data.data
-                                if isinstance(raw, bytes):
-                                    images_data_local.append(raw)
-                                elif isinstance(raw, str):
-                                    images_data_local.append(base64.b64decode(raw))
-                            except Exception as e2:
-                                logger.error(f"[Gemini] Failed to extract image data: {e2}")
+                            images_data_local.append(_inline_image_bytes(part))
+                        except Exception as e:
+                            logger.error(f"[Gemini] Failed to extract image data: {e}")
             return images_data_local, text_messages_local, _extract_block_reason(response_obj)
 
-        # --- Call API (loop for multi-image) ---
-        all_images_data = []
-        all_text_messages = []
-        total_prompt_tokens = 0
-        total_output_tokens = 0
-        total_all_tokens = 0
-        response = None
-
-        for gen_idx in range(num_images):
-            use_custom_endpoint = bool(effective_url)
-            has_any_ref = ref_images is not None or image1 is not None or image2 is not None or image3 is not None
-            attempt_plan = [
-                ("official-primary", False, contents, gen_config_primary),
-            ]
-            # Add a conservative fallback for multi-reference/image-edit scenarios.
-            # Drops optional image_config to improve pass rate on false-positive moderation.
+        # --- Call API (one independent round per requested image) ---
+        use_custom_endpoint = bool(effective_url)
+        attempt_plan = [
+            ("official-primary", False, contents, gen_config_primary),
+        ]
+        # Add a conservative fallback for multi-reference/image-edit scenarios.
+        # Drops optional image_config to improve pass rate on false-positive moderation.
+        if has_any_ref:
+            attempt_plan.append(
+                ("official-fallback", False, contents, gen_config_fallback)
+            )
+        if use_custom_endpoint:
+            attempt_plan.append(
+                ("custom-primary", True, contents, gen_config_primary)
+            )
             if has_any_ref:
                 attempt_plan.append(
-                    ("official-fallback", False, contents, gen_config_fallback)
+                    ("custom-fallback", True, contents, gen_config_fallback)
                 )
-            if use_custom_endpoint:
-                attempt_plan.append(
-                    ("custom-primary", True, contents, gen_config_primary)
-                )
-                if has_any_ref:
-                    attempt_plan.append(
-                        ("custom-fallback", True, contents, gen_config_fallback)
-                    )
 
-            last_exception = None
-            got_image_this_round = False
-            block_reason_last = ""
+        def _run_round(gen_idx: int) -> dict:
+            """Walk the attempt plan until one attempt returns an image.
+
+            Rounds share no mutable state, so they can run concurrently;
+            results are merged by the caller in round order.
+            """
+            result = {
+                "images": [],
+                "texts": [],
+                "tokens": (0, 0, 0),
+                "response": None,
+                "exception": None,
+                "block_reason": "",
+            }
+            round_prompt_tokens = 0
+            round_output_tokens = 0
+            round_total_tokens = 0
             for attempt_idx, (attempt_name, use_custom, attempt_contents, attempt_config) in enumerate(attempt_plan):
                 try:
                     client = _build_client(use_custom_endpoint=use_custom)
-                    response = client.models.generate_content(
+                    response_obj = client.models.generate_content(
                         model=effective_model,
                         contents=attempt_contents,
                         config=attempt_config,
                     )
                 except Exception as e:
-                    last_exception = e
+                    result["exception"] = e
                     logger.warning(
-                        f"[Gemini] Attempt {attempt_idx + 1}/{len(attempt_plan)} "
+                        f"[Gemini] Image {gen_idx + 1} attempt {attempt_idx + 1}/{len(attempt_plan)} "
                         f"({attempt_name}) failed: {e}"
                     )
-                    if attempt_idx < len(attempt_plan) - 1:
-                        continue
-                    break
+                    continue
 
-                images_data, text_messages, block_reason = _parse_response(response)
-                block_reason_last = block_reason
-                all_text_messages.extend(text_messages)
+                result["response"] = response_obj
+                images_data, text_messages, block_reason = _parse_response(response_obj)
+                result["block_reason"] = block_reason
+                result["texts"].extend(text_messages)
 
                 # Log token usage from response metadata
-                if hasattr(response, 'usage_metadata') and response.usage_metadata:
-                    um = response.usage_metadata
+                if hasattr(response_obj, 'usage_metadata') and response_obj.usage_metadata:
+                    um = response_obj.usage_metadata
                     prompt_tokens = getattr(um, 'prompt_token_count', 0) or 0
                     output_tokens = getattr(um, 'candidates_token_count', 0) or 0
                     total_tokens = getattr(um, 'total_token_count', 0) or 0
-                    total_prompt_tokens += prompt_tokens
-                    total_output_tokens += output_tokens
-                    total_all_tokens += total_tokens
+                    round_prompt_tokens += prompt_tokens
+                    round_output_tokens += output_tokens
+                    round_total_tokens += total_tokens
                     logger.info(
                         f"[Gemini] Token usage | Attempt: {attempt_name} | "
                         f"Prompt: {prompt_tokens} | Output: {output_tokens} | "
@@ -408,49 +461,56 @@ class GeminiImageGenerate:
                     )
 
                 if images_data:
-                    all_images_data.extend(images_data)
-                    got_image_this_round = True
+                    result["images"] = images_data
                     break
 
                 logger.warning(
-                    f"[Gemini] Attempt {attempt_idx + 1}/{len(attempt_plan)} "
+                    f"[Gemini] Image {gen_idx + 1} attempt {attempt_idx + 1}/{len(attempt_plan)} "
                     f"({attempt_name}) returned no image. "
                     f"BlockReason: {block_reason or 'N/A'}"
                 )
-                if attempt_idx < len(attempt_plan) - 1:
-                    continue
+
+            result["tokens"] = (round_prompt_tokens, round_output_tokens, round_total_tokens)
+            return result
+
+        if num_images > 1:
+            # Rounds are independent and network-bound: run them concurrently,
+            # capped to stay within Gemini's per-minute rate limits.
+            with ThreadPoolExecutor(max_workers=min(num_images, MAX_PARALLEL_REQUESTS)) as executor:
+                round_results = list(executor.map(_run_round, range(num_images)))
+        else:
+            round_results = [_run_round(0)]
+
+        all_images_data = []
+        all_text_messages = []
+        total_prompt_tokens = 0
+        total_output_tokens = 0
+        total_all_tokens = 0
+        response = None
+
+        for gen_idx, round_result in enumerate(round_results):
+            all_text_messages.extend(round_result["texts"])
+            total_prompt_tokens += round_result["tokens"][0]
+            total_output_tokens += round_result["tokens"][1]
+            total_all_tokens += round_result["tokens"][2]
+            if round_result["response"] is not None:
+                response = round_result["response"]
+
+            got_image_this_round = bool(round_result["images"])
+            last_exception = round_result["exception"]
+            block_reason_last = round_result["block_reason"]
+            all_images_data.extend(round_result["images"])
 
             if gen_idx < num_images - 1:
                 logger.info(f"[Gemini] Generated image {gen_idx+1}/{num_images}")
 
             if not got_image_this_round and last_exception is not None:
                 error_str = str(last_exception)
-                if "401" in error_str or "UNAUTHENTICATED" in error_str:
-                    raise RuntimeError(
-                        f"[APIImage Gemini] Authentication failed (401). "
-                        f"Please check your Google API key."
-                    )
-                elif "404" in error_str or "NOT_FOUND" in error_str:
-                    raise RuntimeError(
-                        f"[APIImage Gemini] Model '{effective_model}' not found (404)."
-                    )
-                elif "403" in error_str or "PERMISSION_DENIED" in error_str:
-                    raise RuntimeError(
-                        f"[APIImage Gemini] Permission denied (403). "
-                        f"Check billing at: https://aistudio.google.com"
-                    )
-                elif "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                    raise RuntimeError(
-                        f"[APIImage Gemini] API quota exceeded (429). "
-                        f"Wait for quota reset or switch to a different model."
-                    )
-                elif "503" in error_str or "UNAVAILABLE" in error_str:
-                    raise RuntimeError(
-                        f"[APIImage Gemini] Model overloaded (503). Retry in 1-2 minutes."
-                    )
-                elif "timed out" in error_str.lower() or "timeout" in error_str.lower():
+                m = _ERR_RE.search(error_str)
+                if m:
+                    message = _ERR_MESSAGES[m.lastgroup]
                     raise RuntimeError(
-                        f"[APIImage Gemini] Network timeout. Check your connection."
+                        f"[APIImage Gemini] {message.format(model=effective_model)}"
                     )
                 raise RuntimeError(f"[APIImage Gemini] API Error: {error_str}")
 
@@ -15,9 +15,7 @@ Reference: https://open.bigmodel.cn/dev/api/image/cogview
 import logging
 import base64
 
-import requests as http_requests
-
-from .config import get_api_config, get_model_list, BUILTIN_MODELS
+from .config import get_api_config, get_model_list, BUILTIN_MODELS, _get_cached
 from .utils import bytes_to_tensor, sanitize_url, validate_ref_images
 
 logger = logging.getLogger("ComfyUI-APIImage")
@@ -31,6 +29,20 @@ MODEL_REF_IMAGE_LIMITS = {
     "cogview-4-250304": (0, 0),
 }
 
+# Quality and size values are sent to the GLM images API as-is
+_API_TYPE = "GLM Image"
+_QUALITY_OPT = (["hd", "standard"], {
+    "default": "hd"
+})
+_SIZE_OPT = ([
+    "1280x1280", "1568x1056", "1056x1568",
+    "1472x1088", "1088x1472", "1728x960", "960x1728",
+    "1024x1024", "768x1344", "864x1152",
+    "1344x768", "1152x864", "1440x720", "720x1440",
+], {
+    "default": "1280x1280"
+})
+
 
 class GLMImageGenerate:
     """
@@ -40,6 +52,8 @@ class GLMImageGenerate:
     Uses REST API with Bearer token authentication.
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/GLM"
     FUNCTION = "generate"
     OUTPUT_NODE = True
@@ -48,13 +62,14 @@ class GLMImageGenerate:
 
     @classmethod
     def INPUT_TYPES(cls):
-        models = get_model_list("GLM Image")
+        cfg = _get_cached()
+        models = get_model_list(_API_TYPE, _cfg=cfg)
         if not models:
-            models = BUILTIN_MODELS.get("GLM Image", ["glm-image"])
+            models = BUILTIN_MODELS.get(_API_TYPE, ["glm-image"])
 
-        saved_config = get_api_config("GLM Image")
-        saved_key = saved_config.get("api_key", "")
-        saved_url = saved_config.get("base_url", "https://open.bigmodel.cn/api")
+        saved_config = get_api_config(_API_TYPE, _cfg=cfg)
+        saved_key = saved_config.api_key
+        saved_url = saved_config.base_url
 
         return {
             "required": {
@@ -70,17 +85,8 @@ class GLMImageGenerate:
                 "model_name": (models, {
                     "default": models[0] if models else "glm-image"
                 }),
-                "quality": (["hd", "standard"], {
-                    "default": "hd"
-                }),
-                "size": ([
-                    "1280x1280", "1568x1056", "1056x1568",
-                    "1472x1088", "1088x1472", "1728x960", "960x1728",
-                    "1024x1024", "768x1344", "864x1152",
-                    "1344x768", "1152x864", "1440x720", "720x1440",
-                ], {
-                    "default": "1280x1280"
-                }),
+                "quality": _QUALITY_OPT,
+                "size": _SIZE_OPT,
             },
             "optional": {
                 "num_images": ("INT", {
@@ -197,6 +203,8 @@ class GLMImageGenerate:
 
     def _call_api(self, base_url, api_key, model, prompt, quality, size):
         """Make a single API call and return (list of image bytes, usage dict)."""
+        import requests as http_requests
+
         url = f"{base_url}/paas/v4/images/generations"
         headers = {
             "Content-Type": "application/json",
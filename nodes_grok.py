@@ -13,7 +13,7 @@ import base64
 import logging
 import io
 
-from .config import get_api_config, get_model_list, BUILTIN_MODELS
+from .config import get_api_config, get_model_list, BUILTIN_MODELS, _get_cached
 from .utils import tensor_to_pil, mask_to_pil, bytes_to_tensor, detect_mime, sanitize_url, validate_ref_images
 
 logger = logging.getLogger("ComfyUI-APIImage")
@@ -26,6 +26,15 @@ MODEL_REF_IMAGE_LIMITS = {
     "grok-imagine-image-pro": (0, 1),
 }
 
+# Aspect ratio and resolution choices accepted by Grok image generation
+_API_TYPE = "Grok API"
+_ASPECT_RATIO_OPT = (["1:1", "16:9", "9:16", "4:3", "3:4"], {
+    "default": "1:1",
+})
+_RESOLUTION_OPT = (["1k", "2k"], {
+    "default": "1k",
+})
+
 
 class GrokImageGenerate:
     """
@@ -35,6 +44,8 @@ class GrokImageGenerate:
     Uses the xai_sdk Python SDK with protobuf for editing mode.
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/Grok"
     FUNCTION = "generate"
     OUTPUT_NODE = True
@@ -43,13 +54,14 @@ class GrokImageGenerate:
 
     @classmethod
     def INPUT_TYPES(cls):
-        models = get_model_list("Grok API")
+        cfg = _get_cached()
+        models = get_model_list(_API_TYPE, _cfg=cfg)
         if not models:
-            models = BUILTIN_MODELS.get("Grok API", ["grok-imagine-image-pro"])
+            models = BUILTIN_MODELS.get(_API_TYPE, ["grok-imagine-image-pro"])
 
-        saved_config = get_api_config("Grok API")
-        saved_key = saved_config.get("api_key", "")
-        saved_url = saved_config.get("base_url", "https://api.x.ai")
+        saved_config = get_api_config(_API_TYPE, _cfg=cfg)
+        saved_key = saved_config.api_key
+        saved_url = saved_config.base_url
 
         return {
             "required": {
@@ -72,12 +84,8 @@ class GrokImageGenerate:
                     "min": 1,
                     "max": 4,
                 }),
-                "aspect_ratio": (["1:1", "16:9", "9:16", "4:3", "3:4"], {
-                    "default": "1:1",
-                }),
-                "resolution": (["1k", "2k"], {
-                    "default": "1k",
-                }),
+                "aspect_ratio": _ASPECT_RATIO_OPT,
+                "resolution": _RESOLUTION_OPT,
                 "base_url": ("STRING", {
                     "default": saved_url,
                     "placeholder": "https://api.x.ai (default)"
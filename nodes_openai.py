@@ -12,9 +12,7 @@ Reference: https://platform.openai.com/docs/api-reference/images/create
 import base64
 import logging
 
-import requests
-
-from .config import get_api_config, get_model_list, BUILTIN_MODELS
+from .config import get_api_config, get_model_list, BUILTIN_MODELS, _get_cached
 from .utils import tensor_to_pil, pil_to_tensor, mask_to_pil, bytes_to_tensor, sanitize_url, validate_ref_images
 
 logger = logging.getLogger("ComfyUI-APIImage")
@@ -30,6 +28,23 @@ MODEL_REF_IMAGE_LIMITS = {
     "dall-e-2": (0, 1),
 }
 
+# Sizes cover both gpt-image-1 and DALL-E; not every model accepts every size
+_API_TYPE = "OpenAI Compatible"
+_SIZE_OPT = ([
+    "1024x1024",  # Square (all models)
+    "1024x1536",  # Portrait (gpt-image-1)
+    "1536x1024",  # Landscape (gpt-image-1)
+    "1024x1792",  # Portrait (DALL-E 3)
+    "1792x1024",  # Landscape (DALL-E 3)
+    "512x512",    # DALL-E 2
+    "256x256",    # DALL-E 2
+], {
+    "default": "1024x1024"
+})
+_QUALITY_OPT = (["auto", "high", "standard"], {
+    "default": "auto"
+})
+
 
 class OpenAIImageGenerate:
     """
@@ -39,6 +54,8 @@ class OpenAIImageGenerate:
     Uses the standard /v1/images/generations endpoint.
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/OpenAI"
     FUNCTION = "generate"
     OUTPUT_NODE = True
@@ -47,13 +64,14 @@ class OpenAIImageGenerate:
 
     @classmethod
     def INPUT_TYPES(cls):
-        models = get_model_list("OpenAI Compatible")
+        cfg = _get_cached()
+        models = get_model_list(_API_TYPE, _cfg=cfg)
         if not models:
-            models = BUILTIN_MODELS.get("OpenAI Compatible", ["dall-e-3"])
+            models = BUILTIN_MODELS.get(_API_TYPE, ["dall-e-3"])
 
-        saved_config = get_api_config("OpenAI Compatible")
-        saved_key = saved_config.get("api_key", "")
-        saved_url = saved_config.get("base_url", "https://api.openai.com")
+        saved_config = get_api_config(_API_TYPE, _cfg=cfg)
+        saved_key = saved_config.api_key
+        saved_url = saved_config.base_url
 
         return {
             "required": {
@@ -73,17 +91,7 @@ class OpenAIImageGenerate:
                 "model_name": (models, {
                     "default": models[0] if models else "dall-e-3"
                 }),
-                "size": ([
-                    "1024x1024",  # Square (all models)
-                    "1024x1536",  # Portrait (gpt-image-1)
-                    "1536x1024",  # Landscape (gpt-image-1)
-                    "1024x1792",  # Portrait (DALL-E 3)
-                    "1792x1024",  # Landscape (DALL-E 3)
-                    "512x512",    # DALL-E 2
-                    "256x256",    # DALL-E 2
-                ], {
-                    "default": "1024x1024"
-                }),
+                "size": _SIZE_OPT,
             },
             "optional": {
                 "num_images": ("INT", {
@@ -91,9 +99,7 @@ class OpenAIImageGenerate:
                     "min": 1,
                     "max": 4,
                 }),
-                "quality": (["auto", "high", "standard"], {
-                    "default": "auto"
-                }),
+                "quality": _QUALITY_OPT,
                 "ref_images": ("IMAGE",),
                 "image1": ("IMAGE",),
                 "image2": ("IMAGE",),
@@ -130,6 +136,7 @@ class OpenAIImageGenerate:
         - Response: { data: [{ b64_json: "..." }, ...] }
         """
         import torch
+        import requests
 
         # --- Input Validation ---
         if not prompt or not prompt.strip():
@@ -13,9 +13,8 @@ Reference: https://help.aliyun.com/zh/model-studio/developer-reference/tongyi-wa
 import logging
 import io
 import base64
-import requests
 
-from .config import get_api_config, get_model_list, BUILTIN_MODELS
+from .config import get_api_config, get_model_list, BUILTIN_MODELS, _get_cached
 from .utils import tensor_to_pil, mask_to_pil, bytes_to_tensor, sanitize_url, validate_ref_images
 
 logger = logging.getLogger("ComfyUI-APIImage")
@@ -29,6 +28,18 @@ MODEL_REF_IMAGE_LIMITS = {
     "qwen-image-edit": (1, 3),
 }
 
+# DashScope expects sizes as "W*H", so the choices use "*" rather than "x"
+_API_TYPE = "Qwen Image"
+_SIZE_OPT = ([
+    "1664*928",   # 16:9 (default)
+    "1472*1104",  # 4:3
+    "1328*1328",  # 1:1
+    "1104*1472",  # 3:4
+    "928*1664",   # 9:16
+], {
+    "default": "1664*928"
+})
+
 
 class QwenImageGenerate:
     """
@@ -40,6 +51,8 @@ class QwenImageGenerate:
     - Watermark control, negative prompt, prompt extension
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/Qwen"
     FUNCTION = "generate"
     OUTPUT_NODE = True
@@ -48,13 +61,14 @@ class QwenImageGenerate:
 
     @classmethod
     def INPUT_TYPES(cls):
-        models = get_model_list("Qwen Image")
+        cfg = _get_cached()
+        models = get_model_list(_API_TYPE, _cfg=cfg)
         if not models:
-            models = BUILTIN_MODELS.get("Qwen Image", ["qwen-image-plus"])
+            models = BUILTIN_MODELS.get(_API_TYPE, ["qwen-image-plus"])
 
-        saved_config = get_api_config("Qwen Image")
-        saved_key = saved_config.get("api_key", "")
-        saved_url = saved_config.get("base_url", "https://dashscope.aliyuncs.com/api/v1")
+        saved_config = get_api_config(_API_TYPE, _cfg=cfg)
+        saved_key = saved_config.api_key
+        saved_url = saved_config.base_url
 
         return {
             "required": {
@@ -70,15 +84,7 @@ class QwenImageGenerate:
                 "model_name": (models, {
                     "default": models[0] if models else "qwen-image-plus"
                 }),
-                "size": ([
-                    "1664*928",   # 16:9 (default)
-                    "1472*1104",  # 4:3
-                    "1328*1328",  # 1:1
-                    "1104*1472",  # 3:4
-                    "928*1664",   # 9:16
-                ], {
-                    "default": "1664*928"
-                }),
+                "size": _SIZE_OPT,
             },
             "optional": {
                 "num_images": ("INT", {
@@ -163,6 +169,7 @@ class QwenImageGenerate:
         """
         import torch
         import os
+        import requests
 
         # --- Input Validation ---
         if not prompt or not prompt.strip():
@@ -3,23 +3,147 @@ Image Save node for ComfyUI API Image plugin.
 
 Saves generated images to ComfyUI's output directory with customizable prefix.
 """
+import io
 import os
 import logging
 import json
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 
 import numpy as np
+from PIL import Image, PngImagePlugin
 
-from .utils import tensor_to_pil
+from .utils import tensor_to_uint8_array
 
 logger = logging.getLogger("ComfyUI-APIImage")
 
+_PngInfo = PngImagePlugin.PngInfo
+
 # Try to import ComfyUI's folder_paths for output directory
 try:
     import folder_paths
 except ImportError:
     folder_paths = None
 
+# Optional faster PNG encoder (libpng + zlib-ng in the imagecodecs wheels)
+try:
+    import imagecodecs
+    if not imagecodecs.PNG.available:
+        imagecodecs = None
+except (ImportError, AttributeError):
+    imagecodecs = None
+
+# Characters stripped from filename_prefix (path separators and names
+# Windows rejects), so a prefix can never escape or nest the output dir
+_FNAME_TRANS = str.maketrans("", "", '/\\:*?"<>|\x00')
+
+# Metadata texts longer than this are stored deflated as zTXt; below it the
+# compression header outweighs the savings. Texts are ASCII-escaped JSON, so
+# their length is their byte count. ComfyUI's frontend only reads plain tEXt
+# when restoring a dropped image, so the keys it looks for are never compressed.
+_ZTXT_MIN_BYTES = 512
+_PLAIN_TEXT_KEYS = frozenset(("prompt", "workflow"))
+
+# PNG signature (8 bytes) + IHDR chunk (length 4 + type 4 + data 13 + CRC 4)
+_IHDR_END = 33
+
+
+def _dumps_compact(obj):
+    """
+    Serialize a metadata value as compact JSON.
+
+    Non-ASCII text stays \\u-escaped so PIL always writes a Latin-1 tEXt
+    chunk; ComfyUI's frontend cannot read the iTXt it would use otherwise.
+    """
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=True)
+
+
+def _png_chunk_bytes(metadata):
+    """
+    Serialize the chunks collected in a PngInfo as raw PNG chunk bytes.
+
+    Each chunk is length || type || data || CRC32(type || data), per the
+    PNG spec, ready to be spliced into an encoded stream after IHDR.
+    """
+    out = []
+    for chunk in metadata.chunks:
+        cid, data = chunk[0], chunk[1]
+        out.append(struct.pack(">I", len(data)))
+        out.append(cid)
+        out.append(data)
+        out.append(struct.pack(">I", zlib.crc32(cid + data)))
+    return b"".join(out)
+
+
+def _encode_png(pixels, metadata, metadata_chunks, compress_level, filter_mode):
+    """
+    Encode one uint8 [H, W, C] image array to PNG bytes in memory.
+
+    Uses imagecodecs when available, feeding it the array directly and
+    splicing the pre-serialized metadata chunks in after IHDR; otherwise (or
+    if imagecodecs rejects the image) wraps it in PIL and saves with the
+    PngInfo object.
+
+    filter_mode "none" skips PNG row filtering, which saves encode time but
+    can make files on smooth content noticeably larger; "adaptive" keeps
+    libpng's default. It only applies to the imagecodecs path: PIL has no
+    public filter option and always filters adaptively.
+    """
+    if imagecodecs is not None:
+        try:
+            png_filter = imagecodecs.PNG.FILTER.NONE if filter_mode == "none" else None
+            data = imagecodecs.png_encode(pixels, level=compress_level,
+                                          filter=png_filter)
+            if metadata_chunks:
+                data = data[:_IHDR_END] + metadata_chunks + data[_IHDR_END:]
+            return data
+        except Exception as e:
+            logger.debug(f"[Save] imagecodecs encode failed, using PIL: {e}")
+
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="PNG", pnginfo=metadata,
+                                 compress_level=compress_level, optimize=False)
+    return buf.getbuffer()
+
+
+def _write_file(filepath, data):
+    """
+    Write an encoded image to disk atomically.
+
+    The bytes go to a sibling ".part" file through an unbuffered handle
+    (normally one write syscall) and are then renamed over filepath, so an
+    interrupted save never leaves a truncated PNG under the final name.
+    """
+    tmp_path = filepath + ".part"
+    try:
+        f = open(tmp_path, "wb", buffering=0)
+    except FileNotFoundError:
+        # Output directory was removed after it was cached; recreate it once
+        os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+        f = open(tmp_path, "wb", buffering=0)
+    try:
+        with f:
+            view = memoryview(data)
+            while view:
+                view = view[f.write(view):]
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _encode_and_write(pixels, filepath, metadata, metadata_chunks, compress_level, filter_mode):
+    """Encode one uint8 image array as PNG and write it to filepath."""
+    _write_file(filepath, _encode_png(pixels, metadata, metadata_chunks,
+                                      compress_level, filter_mode))
+    logger.info(f"[Save] Image saved: {filepath}")
+
 
 class APIImageSave:
     """
@@ -29,11 +153,16 @@ class APIImageSave:
     Compatible with ComfyUI's image preview system.
     """
 
+    __slots__ = ()
+
     CATEGORY = "APIImage/Utils"
     FUNCTION = "save_images"
     OUTPUT_NODE = True
     RETURN_TYPES = ()  # Output node, no return types needed
 
+    # Output directories already created this session (skips makedirs)
+    _dir_cache = set()
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -49,6 +178,14 @@ class APIImageSave:
                     "default": "",
                     "placeholder": "Custom output directory (leave empty for default)"
                 }),
+                "compress_level": ("INT", {
+                    "default": 1,
+                    "min": 0,
+                    "max": 9,
+                }),
+                "filter_mode": (["none", "adaptive"], {
+                    "default": "none"
+                }),
             },
             "hidden": {
                 "prompt": "PROMPT",
@@ -57,7 +194,8 @@ class APIImageSave:
         }
 
     def save_images(self, images, filename_prefix="APIImage",
-                    output_dir="", prompt=None, extra_pnginfo=None):
+                    output_dir="", compress_level=1,
+                    filter_mode="none", prompt=None, extra_pnginfo=None):
         """
         Save images to output directory with metadata.
 
@@ -65,9 +203,13 @@ class APIImageSave:
             images: ComfyUI IMAGE tensor [B, H, W, C]
             filename_prefix: prefix for saved filenames
             output_dir: custom output directory (uses ComfyUI default if empty)
+            compress_level: PNG zlib compression level (0-9)
+            filter_mode: PNG row filtering, "none" or "adaptive"
             prompt: ComfyUI hidden prompt data
             extra_pnginfo: ComfyUI hidden PNG metadata
         """
+        filename_prefix = filename_prefix.translate(_FNAME_TRANS) or "APIImage"
+
         # Determine output directory
         if output_dir and output_dir.strip():
             out_dir = output_dir.strip()
@@ -76,35 +218,58 @@ class APIImageSave:
         else:
             out_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
 
-        os.makedirs(out_dir, exist_ok=True)
+        if out_dir not in self._dir_cache:
+            os.makedirs(out_dir, exist_ok=True)
+            self._dir_cache.add(out_dir)
 
-        # Convert tensor to PIL images
-        pil_images = tensor_to_pil(images)
+        # One contiguous uint8 [B, H, W, C] buffer; each image is a slice of it
+        pixels = tensor_to_uint8_array(images)
 
-        results = []
-        for i, img in enumerate(pil_images):
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{filename_prefix}_{timestamp}_{i:04d}.png"
-            filepath = os.path.join(out_dir, filename)
-
-            # Add metadata if available
-            from PIL import PngImagePlugin
-            metadata = PngImagePlugin.PngInfo()
+        # Metadata is identical for every image in the batch; build it once.
+        # Compact JSON keeps the text payloads small. Headless runs without
+        # any hidden inputs skip metadata entirely.
+        metadata = None
+        metadata_chunks = b""
+        if prompt is not None or extra_pnginfo:
+            metadata = _PngInfo()
+            texts = []
             if prompt is not None:
-                metadata.add_text("prompt", json.dumps(prompt))
-            if extra_pnginfo is not None:
+                texts.append(("prompt", _dumps_compact(prompt)))
+            if extra_pnginfo:
                 for k, v in extra_pnginfo.items():
-                    metadata.add_text(k, json.dumps(v))
+                    texts.append((k, _dumps_compact(v)))
+            for k, text in texts:
+                zip_text = k not in _PLAIN_TEXT_KEYS and len(text) > _ZTXT_MIN_BYTES
+                metadata.add_text(k, text, zip=zip_text)
+            if imagecodecs is not None:
+                metadata_chunks = _png_chunk_bytes(metadata)
+
+        # One timestamp for the whole batch; the index suffix keeps names unique
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix_ts = f"{filename_prefix}_{timestamp}_"
 
-            # Save image
-            img.save(filepath, pnginfo=metadata)
-            logger.info(f"[Save] Image saved: {filepath}")
+        # Full filename/path table for the batch, built up front
+        names = [f"{prefix_ts}{i:04d}.png" for i in range(pixels.shape[0])]
+        dir_prefix = os.path.join(out_dir, "")
+        paths = [dir_prefix + name for name in names]
+        tasks = list(zip(pixels, paths))
 
-            results.append({
-                "filename": filename,
-                "subfolder": "",
-                "type": "output",
-            })
+        save_one = partial(
+            _encode_and_write,
+            metadata=metadata,
+            metadata_chunks=metadata_chunks,
+            compress_level=compress_level,
+            filter_mode=filter_mode,
+        )
+
+        # zlib releases the GIL while deflating, so batch encodes overlap across cores
+        if len(tasks) <= 1:
+            for frame, filepath in tasks:
+                save_one(frame, filepath)
+        else:
+            workers = min(len(tasks), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                list(ex.map(lambda t: save_one(*t), tasks))
 
+        results = [{"filename": name, "subfolder": "", "type": "output"} for name in names]
         return {"ui": {"images": results}}
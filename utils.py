@@ -20,11 +20,44 @@ except ImportError:
     torch = None
 
 try:
-    from PIL import Image
+    from PIL import Image, ImageOps
 except ImportError:
     Image = None
 
 
+def tensor_to_uint8_array(tensor):
+    """
+    Convert ComfyUI IMAGE tensor [B,H,W,C] to one uint8 numpy array.
+
+    Images are scaled and cast one at a time into a preallocated uint8
+    array, so the float temporaries never exceed a single image. Callers
+    that only need raw pixels (e.g. PNG encoders) can slice it per image
+    without building PIL objects.
+
+    Args:
+        tensor: torch.Tensor of shape [B, H, W, C] or [H, W, C]
+
+    Returns:
+        numpy.ndarray of shape [B, H, W, C], dtype uint8, range [0, 255]
+    """
+    # Ensure tensor is on CPU and detached
+    if hasattr(tensor, 'cpu'):
+        tensor = tensor.cpu().detach()
+
+    # Handle single image without batch dim
+    if tensor.dim() == 3:
+        tensor = tensor.unsqueeze(0)
+
+    batch = tensor.numpy()
+    out = np.empty(batch.shape, dtype=np.uint8)
+    for i in range(batch.shape[0]):
+        # [H, W, C] float32 0-1 -> uint8 0-255 (assignment truncates like astype)
+        scaled = batch[i] * 255.0
+        np.clip(scaled, 0, 255, out=scaled)
+        out[i] = scaled
+    return out
+
+
 def tensor_to_pil(tensor):
     """
     Convert ComfyUI IMAGE tensor [B,H,W,C] to list of PIL Images.
@@ -43,23 +76,7 @@ def tensor_to_pil(tensor):
     if Image is None:
         raise ImportError("Pillow is required: pip install Pillow")
 
-    images = []
-    # Ensure tensor is on CPU and detached
-    if hasattr(tensor, 'cpu'):
-        tensor = tensor.cpu().detach()
-
-    # Handle single image without batch dim
-    if tensor.dim() == 3:
-        tensor = tensor.unsqueeze(0)
-
-    for i in range(tensor.shape[0]):
-        # [H, W, C] float32 0-1 -> uint8 0-255
-        img_np = tensor[i].numpy()
-        img_np = np.clip(img_np * 255.0, 0, 255).astype(np.uint8)
-        img = Image.fromarray(img_np, mode="RGB")
-        images.append(img)
-
-    return images
+    return [Image.fromarray(img_np, mode="RGB") for img_np in tensor_to_uint8_array(tensor)]
 
 
 def pil_to_tensor(pil_images):
@@ -160,6 +177,13 @@ def bytes_to_tensor(image_bytes_list):
     """
     Convert list of raw image bytes to ComfyUI IMAGE tensor [B,H,W,C].
 
+    Decoded images are written straight into one preallocated float32
+    [B, H, W, 3] buffer and scaled in place, instead of building a tensor
+    per image and stacking. Images whose size differs from the first one
+    are center-cropped to its aspect ratio and then resized to match (the
+    same crop ComfyUI's Batch Images node applies), since an IMAGE batch
+    must share one resolution.
+
     Args:
         image_bytes_list: list of bytes (PNG/JPEG/etc.)
 
@@ -168,6 +192,8 @@ def bytes_to_tensor(image_bytes_list):
     """
     if Image is None:
         raise ImportError("Pillow is required: pip install Pillow")
+    if torch is None:
+        raise ImportError("PyTorch is required")
 
     pil_images = []
     for img_bytes in image_bytes_list:
@@ -183,7 +209,19 @@ def bytes_to_tensor(image_bytes_list):
     if not pil_images:
         raise ValueError("No valid images could be decoded from the provided bytes")
 
-    return pil_to_tensor(pil_images)
+    width, height = pil_images[0].size
+    batch = np.empty((len(pil_images), height, width, 3), dtype=np.float32)
+    for i, img in enumerate(pil_images):
+        if img.size != (width, height):
+            logger.warning(
+                f"Image {i} size {img.size} differs from first image {(width, height)}; "
+                f"center-cropping and resizing to fit the batch"
+            )
+            img = ImageOps.fit(img, (width, height), Image.LANCZOS)
+        batch[i] = np.asarray(img)
+    np.divide(batch, 255.0, out=batch)
+
+    return torch.from_numpy(batch)
 
 
 def detect_mime(data):